@@ -0,0 +1,172 @@
+"""Benchmark de memória: modelos antigos (dataclass + meta inchado) vs compactos.
+
+Simula N empresas enriquecidas com o que a baseline de fato mantinha em
+memória: campos do modelo, `meta` vindo do LLM (confidence, sources,
+relations) e `_raw_content` apenas nas respostas cujo parse falhou
+(`--parse-failure-rate`). Hints de busca são transitórios nos dois modos.
+Mede o pico de RSS de cada modo em um subprocesso separado.
+
+Uso:
+    python benchmarks/bench_memory.py --companies 10000
+"""
+
+import argparse
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+SECTORS = [f"Setor {i}" for i in range(30)]
+PRODUCTS = [f"produto {i}" for i in range(80)]
+
+
+@dataclass
+class LegacyBrand:
+    name: str
+    cnpjs: list[str] = field(default_factory=list)
+    products: list[str] = field(default_factory=list)
+    description: Optional[str] = None
+    parent_company: Optional[str] = None
+
+
+@dataclass
+class LegacyCompany:
+    name: str
+    revenue: Optional[float] = None
+    sector: Optional[str] = None
+    website: Optional[str] = None
+    linkedin: Optional[str] = None
+    cnpjs: list[str] = field(default_factory=list)
+    addresses: list[str] = field(default_factory=list)
+    description: Optional[str] = None
+    brands: list = field(default_factory=list)
+    products: list[str] = field(default_factory=list)
+    group: Optional[str] = None
+    meta: dict = field(default_factory=dict)
+
+
+def fresh(text: str) -> str:
+    """Cria uma cópia nova da string, como acontece ao decodificar JSON/HTML."""
+    return "".join(list(text))
+
+
+def fake_enrichment(i: int, rnd: random.Random, parse_failure_rate: float) -> dict:
+    failed = rnd.random() < parse_failure_rate
+    return {
+        "name": f"Empresa {i}",
+        "revenue": rnd.random() * 1e5,
+        "sector": fresh(rnd.choice(SECTORS)),
+        "website": f"https://exemplo{i}.com.br",
+        "products": [fresh(p) for p in rnd.sample(PRODUCTS, 5)],
+        "brands": [fresh(f"Marca {rnd.randint(0, 500)}") for _ in range(3)],
+        "group": fresh(f"Grupo {rnd.randint(0, 200)}"),
+        "raw": fresh("{\"description\": \"texto cru do LLM\"} " * 60) if failed else None,
+        "meta": {
+            "confidence": rnd.random(),
+            "sources": [f"https://exemplo{i}.com.br/pagina/{h}" for h in range(3)],
+            "relations": [{"target": f"Empresa {rnd.randint(0, 10000)}", "type": "RELATED_TO"}],
+        },
+    }
+
+
+def run_legacy(n: int, parse_failure_rate: float) -> None:
+    rnd = random.Random(42)
+    companies = []
+    for i in range(n):
+        d = fake_enrichment(i, rnd, parse_failure_rate)
+        meta = dict(d["meta"])
+        if d["raw"]:
+            meta["_raw_content"] = d["raw"]
+        companies.append(
+            LegacyCompany(
+                name=d["name"],
+                revenue=d["revenue"],
+                sector=d["sector"],
+                website=d["website"],
+                products=d["products"],
+                brands=[LegacyBrand(name=b) for b in d["brands"]],
+                group=d["group"],
+                meta=meta,
+            )
+        )
+    report("legacy", len(companies))
+
+
+def run_compact(n: int, parse_failure_rate: float) -> None:
+    sys.path.insert(0, str(SRC))
+    from models.brand import Brand
+    from models.company import Company
+    from services.storage.payload_store import PayloadStore
+
+    rnd = random.Random(42)
+    companies = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PayloadStore(tmp)
+        for i in range(n):
+            d = fake_enrichment(i, rnd, parse_failure_rate)
+            meta = dict(d["meta"])
+            if d["raw"]:
+                meta["raw_content_ref"] = store.put("llm", d["raw"])
+            companies.append(
+                Company(
+                    name=d["name"],
+                    revenue=d["revenue"],
+                    sector=d["sector"],
+                    website=d["website"],
+                    products=d["products"],
+                    brands=[Brand(name=b) for b in d["brands"]],
+                    group=d["group"],
+                    meta=meta,
+                )
+            )
+        report("compact", len(companies))
+
+
+def report(mode: str, count: int) -> None:
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{mode}\t{count}\t{peak_kb / 1024:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--companies", type=int, default=10000)
+    parser.add_argument("--parse-failure-rate", type=float, default=0.05)
+    parser.add_argument("--mode", choices=["legacy", "compact"], default=None)
+    args = parser.parse_args()
+
+    if args.mode == "legacy":
+        return run_legacy(args.companies, args.parse_failure_rate)
+    if args.mode == "compact":
+        return run_compact(args.companies, args.parse_failure_rate)
+
+    results = {}
+    for mode in ("legacy", "compact"):
+        out = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--companies",
+                str(args.companies),
+                "--parse-failure-rate",
+                str(args.parse_failure_rate),
+                "--mode",
+                mode,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        _, count, peak = out.split("\t")
+        results[mode] = float(peak)
+        print(f"{mode:<8} empresas={count} pico RSS={peak} MB")
+    saved = results["legacy"] - results["compact"]
+    print(f"redução: {saved:.1f} MB ({saved / results['legacy']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark de inicialização da CLI com `python -X importtime`.
+
+Mede o tempo cumulativo de import de `app` e de cada controller, e
+confere que nenhum módulo pesado é carregado por `app.py --help`.
+Sai com código 1 se algum orçamento for estourado.
+
+Uso:
+    python benchmarks/bench_startup.py
+"""
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Orçamentos de import cumulativo (microssegundos)
+BUDGETS_US = {
+    "app": 30_000,
+}
+
+# Módulos que `--help` (e o import de `app`) não podem carregar
+HEAVY_MODULES = ("openai", "agno", "neo4j", "bs4", "requests", "dotenv", "json_repair")
+
+LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def importtime(code: str) -> dict[str, int]:
+    """Roda `code` com -X importtime e devolve {módulo: cumulativo_us} dos imports de nível superior."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC,
+        capture_output=True,
+        text=True,
+    )
+    cumulative: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def main() -> int:
+    failures = 0
+    help_imports = importtime("import sys; sys.argv = ['app.py', '--help']\nimport app\ntry:\n    app.main()\nexcept SystemExit:\n    pass")
+    for module, budget in BUDGETS_US.items():
+        took = help_imports.get(module)
+        status = "ok" if took is not None and took <= budget else "ESTOUROU"
+        failures += status != "ok"
+        print(f"{module:<40} {took or 0:>8} us  (orçamento {budget} us)  {status}")
+
+    loaded = sorted(m for m in help_imports if m.split(".")[0] in HEAVY_MODULES)
+    if loaded:
+        failures += 1
+        print(f"módulos pesados carregados no --help: {', '.join(loaded)}")
+    else:
+        print("nenhum módulo pesado carregado no --help")
+
+    # Informativo: custo de cada etapa quando as dependências estão instaladas
+    for module in (
+        "controllers.scrape_controller",
+        "controllers.enrichment_controller",
+        "controllers.graph_controller",
+    ):
+        took = importtime(f"import {module}").get(module)
+        print(f"{module:<40} {took if took is not None else 'n/d':>8} us")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,46 +6,62 @@ faz fallback para o enriquecimento simples via `LlmEnricher`.
 """
 
 import os
-from typing import Any, Optional
-
-from openai import OpenAI
-from dotenv import load_dotenv
-
-load_dotenv()
-
-try:
-    from agno.agent import Agent as AgnoAgent
-except Exception:  # pragma: no cover - tolera ausência de Agno
-    AgnoAgent = None
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Optional
 
 from models.company import Company
 from models.brand import Brand
+from models._interning import intern_list, intern_str
 from services.enrichment.search_agent import SearchAgent
 from services.enrichment.llm_enricher import LlmEnricher
-from agno.models.openai import OpenAIChat
+from agents.tasks.search_planner import SearchPlanner
+from services.storage.payload_store import PayloadStore
 
+if TYPE_CHECKING:  # pragma: no cover
+    from openai import OpenAI
 
 
 class OrchestratorAgent:
     def __init__(self, view) -> None:
         self.view = view
         self.search_agent = SearchAgent(view=view)
-        self.openai_client = self._init_openai()
-        self.llm_enricher = LlmEnricher(llm_client=self.openai_client, view=view)
-        self.agno_agent = self._build_agno_agent()
+        self.search_planner = SearchPlanner(self.search_agent, limit_per_topic=3)
+        self.payload_store = PayloadStore()
+
+    # Cliente OpenAI, LlmEnricher e agente Agno só são criados no primeiro uso,
+    # evitando importar openai/agno em execuções que não chegam ao LLM.
+    @cached_property
+    def openai_client(self) -> Optional["OpenAI"]:
+        return self._init_openai()
 
-    def _init_openai(self) -> Optional[OpenAI]:
+    @cached_property
+    def llm_enricher(self) -> LlmEnricher:
+        return LlmEnricher(llm_client=self.openai_client, view=self.view)
+
+    @cached_property
+    def agno_agent(self) -> Any:
+        return self._build_agno_agent()
+
+    def _init_openai(self) -> Optional["OpenAI"]:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             self.view.warn(f'OPENAI_API_KEY não definido; LLM ficará inativo.{api_key}')
             return None
+        try:
+            from openai import OpenAI
+        except ImportError:
+            self.view.warn("Pacote openai não instalado; LLM ficará inativo.")
+            return None
         masked = f"...{api_key[-4:]}" if len(api_key) >= 4 else "***"
         self.view.info(f"OPENAI_API_KEY detectada (mascarada): {masked}")
         return OpenAI(api_key=api_key)
 
     def _build_agno_agent(self) -> Any:
         """Constroi um agente Agno, se a lib estiver instalada."""
-        if AgnoAgent is None:
+        try:
+            from agno.agent import Agent as AgnoAgent
+            from agno.models.openai import OpenAIChat
+        except Exception:  # pragma: no cover - tolera ausência de Agno
             self.view.warn("Agno não instalado; usando fallback simples de enriquecimento.")
             return None
         if not self.openai_client:
@@ -69,13 +85,19 @@ class OrchestratorAgent:
         enriched = []
         for company in companies:
             enriched.append(self.enrich_company(company))
+        self._log_search_totals(enriched)
+        if "llm_enricher" in self.__dict__:
+            self.llm_enricher.log_stats()
         return enriched
 
     def enrich_company(self, company: Company) -> Company:
         self.view.info(f"Enriquecendo {company.name}")
-        # Busca temática: tentar capturar marcas, grupo, CNPJ, produtos
-        topics = ["site oficial", "linkedin", "marcas", "subsidiárias", "holding", "grupo econômico", "CNPJ", "produtos", "soluções"]
-        hints = self.search_agent.search_multi(company.name, topics=topics, limit_per_topic=3)
+        # Busca em etapas: alto rendimento primeiro, follow-ups só para campos faltantes
+        plan = self.search_planner.plan(company)
+        hints = plan.hints
+        self._apply_extracted(company, plan.extracted)
+        company.meta["search_queries"] = len(plan.queries)
+        company.meta["search_seconds"] = round(plan.elapsed, 3)
         enriched_data = None
 
         if self.agno_agent:
@@ -83,22 +105,24 @@ class OrchestratorAgent:
 
         if not enriched_data:
             enriched_data = self.llm_enricher.enrich(
-                {**company.__dict__, "hints": hints}
+                {**company.to_dict(), "hints": hints}
             )
 
         self._log_enrichment(company.name, enriched_data)
-        return self._merge(company, enriched_data)
+        company = self._merge(company, enriched_data)
+        self._spill_payloads(company)
+        return company
 
     def _run_agno(self, company: Company, hints) -> Optional[dict]:
         """Executa o agente Agno com prompt consolidado."""
-        payload = {**company.__dict__, "hints": hints}
+        payload = {**company.to_dict(), "hints": hints}
         try:
             # Nota: API pode variar conforme versão do Agno; ajuste se necessário.
             response = self.agno_agent.run(str(payload))
             if hasattr(response, "output") and isinstance(response.output, dict):
-                return response.output
+                return self.llm_enricher.validate(response.output)
             if isinstance(response, dict):
-                return response
+                return self.llm_enricher.validate(response)
         except Exception as exc:  # pragma: no cover
             self.view.warn(f"Falha ao rodar Agno: {exc}. Fallback para LLM simples.")
         return None
@@ -109,10 +133,16 @@ class OrchestratorAgent:
         company.cnpjs = enriched_data.get("cnpjs", company.cnpjs)
         company.addresses = enriched_data.get("addresses", company.addresses)
         company.description = enriched_data.get("description", company.description)
-        brands = enriched_data.get("brands") or []
-        company.brands = [Brand(name=b["name"]) for b in brands if "name" in b]
-        company.products = enriched_data.get("products", company.products)
-        company.group = enriched_data.get("group", company.group)
+        brands = [
+            Brand(name=b["name"], cnpjs=b.get("cnpjs") or [], products=b.get("products") or [], parent_company=company.name)
+            for b in enriched_data.get("brands") or []
+            if isinstance(b, dict) and b.get("name")
+        ]
+        # Como nos demais campos, resposta sem marcas não apaga as já conhecidas
+        if brands:
+            company.brands = brands
+        company.products = intern_list(enriched_data.get("products", company.products))
+        company.group = intern_str(enriched_data.get("group", company.group))
         # Meta e campos extras ficam em company.meta para não perder informação
         extras = {}
         if enriched_data.get("meta"):
@@ -126,6 +156,28 @@ class OrchestratorAgent:
         company.meta.update(extras)
         return company
 
+    def _spill_payloads(self, company: Company) -> None:
+        """Move a saída crua do LLM (parse falho) para o PayloadStore, mantendo só o ID em meta."""
+        raw_content = company.meta.pop("_raw_content", None)
+        if raw_content:
+            company.meta["raw_content_ref"] = self.payload_store.put("llm", raw_content)
+
+    def _apply_extracted(self, company: Company, extracted: dict) -> None:
+        """Preenche campos vazios com o que a extração local já encontrou."""
+        for key in ("website", "linkedin", "cnpjs"):
+            if extracted.get(key) and not getattr(company, key):
+                setattr(company, key, extracted[key])
+
+    def _log_search_totals(self, companies) -> None:
+        if not companies:
+            return
+        queries = sum(c.meta.get("search_queries", 0) for c in companies)
+        seconds = sum(c.meta.get("search_seconds", 0.0) for c in companies)
+        self.view.info(
+            f"Buscas: {queries} consultas para {len(companies)} empresas "
+            f"(média {queries / len(companies):.1f} consultas, {seconds / len(companies):.2f}s por empresa)"
+        )
+
     def _log_enrichment(self, name: str, data: dict) -> None:
         if not data:
             self.view.warn(f"Enriquecimento retornou vazio para {name}")
@@ -0,0 +1,156 @@
+"""Planejador de buscas em etapas para enriquecer uma empresa.
+
+Em vez de disparar todos os tópicos fixos, roda primeiro as buscas de
+maior rendimento (site oficial, LinkedIn), extrai localmente o que já dá
+para preencher a partir dos hints e só emite buscas de follow-up para os
+campos de `Company` que continuam faltando. Marcas/subsidiárias/produtos
+e holding/grupo usam consultas combinadas.
+"""
+
+import re
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlparse
+
+from models.company import Company
+
+CNPJ_RE = re.compile(r"\b\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}\b")
+LINKEDIN_RE = re.compile(r"linkedin\.com/company/([^/?#]+)", re.IGNORECASE)
+
+# Domínios que aparecem nos resultados mas nunca são o site oficial
+NON_OFFICIAL_DOMAINS = (
+    "linkedin.com",
+    "facebook.com",
+    "instagram.com",
+    "twitter.com",
+    "x.com",
+    "youtube.com",
+    "wikipedia.org",
+    "glassdoor.com",
+    "reclameaqui.com.br",
+    "valor.globo.com",
+    "cnpj.biz",
+    "econodata.com.br",
+    "casadosdados.com.br",
+    "duckduckgo.com",
+)
+
+# Palavras genéricas de razão social que não identificam o domínio da empresa
+NAME_STOPWORDS = {"ltda", "brasil", "grupo", "companhia", "cia", "holding", "participacoes", "industria", "comercio"}
+
+# Etapa 1: alto rendimento, sempre executada (salvo campo já preenchido)
+PRIMARY_TOPICS = [
+    ("website", "site oficial"),
+    ("linkedin", "linkedin"),
+]
+
+# Etapa 2: follow-ups condicionados aos campos que seguem vazios
+FOLLOW_UP_TOPICS = [
+    ("cnpjs", "CNPJ"),
+    ("brands", "marcas subsidiárias produtos"),
+    ("group", "holding grupo econômico"),
+]
+
+
+def is_valid_cnpj(value: str) -> bool:
+    """Confere os dois dígitos verificadores do CNPJ (descarta telefones e sequências repetidas)."""
+    digits = [int(ch) for ch in value if ch.isdigit()]
+    if len(digits) != 14 or len(set(digits)) == 1:
+        return False
+    for size in (12, 13):
+        weights = list(range(size - 7, 1, -1)) + list(range(9, 1, -1))
+        remainder = sum(d * w for d, w in zip(digits[:size], weights)) % 11
+        if digits[size] != (0 if remainder < 2 else 11 - remainder):
+            return False
+    return True
+
+
+@dataclass
+class SearchPlan:
+    hints: list[dict[str, Any]] = field(default_factory=list)
+    queries: list[str] = field(default_factory=list)
+    extracted: dict[str, Any] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+class SearchPlanner:
+    def __init__(self, search_agent, limit_per_topic: int = 3) -> None:
+        self.search_agent = search_agent
+        self.limit_per_topic = limit_per_topic
+
+    def plan(self, company: Company) -> SearchPlan:
+        """Executa as etapas de busca e devolve hints + campos extraídos."""
+        plan = SearchPlan()
+        seen_urls: set[str] = set()
+        start = time.monotonic()
+
+        # Reavalia os campos após cada consulta: um resultado de "site oficial"
+        # frequentemente já traz o LinkedIn ou o CNPJ e dispensa a busca seguinte.
+        for fieldname, topic in PRIMARY_TOPICS + FOLLOW_UP_TOPICS:
+            if self._satisfied(company, plan.extracted, fieldname):
+                continue
+            self._run_query(company.name, topic, plan, seen_urls)
+            plan.extracted = self.extract_fields(plan.hints, company.name)
+
+        plan.elapsed = time.monotonic() - start
+        return plan
+
+    def extract_fields(self, hints: list[dict[str, Any]], company_name: str) -> dict[str, Any]:
+        """Extração local (sem LLM) de website, LinkedIn e CNPJs a partir dos hints."""
+        extracted: dict[str, Any] = {}
+        cnpjs: list[str] = []
+        name_tokens = [
+            t for t in re.split(r"\W+", self._ascii_lower(company_name)) if len(t) >= 3 and t not in NAME_STOPWORDS
+        ]
+        for hint in hints:
+            url = hint.get("url") or ""
+            if "linkedin" not in extracted and self._linkedin_matches(url, name_tokens):
+                extracted["linkedin"] = url
+            if "website" not in extracted and self._looks_official(url, name_tokens):
+                extracted["website"] = url
+        # CNPJs só do site oficial ou de resultados cujo título cita a empresa;
+        # listagens de agregadores trazem CNPJs de outras empresas no conteúdo.
+        official_host = urlparse(extracted.get("website") or "").hostname
+        for hint in hints:
+            host = urlparse(hint.get("url") or "").hostname
+            title = self._ascii_lower(hint.get("title") or "")
+            if not (official_host and host == official_host) and not any(t in title for t in name_tokens):
+                continue
+            for match in CNPJ_RE.findall(f"{hint.get('title') or ''} {hint.get('content') or ''}"):
+                if match not in cnpjs and is_valid_cnpj(match):
+                    cnpjs.append(match)
+        if cnpjs:
+            extracted["cnpjs"] = cnpjs
+        return extracted
+
+    def _run_query(self, base: str, topic: str, plan: SearchPlan, seen_urls: set[str]) -> None:
+        query = f"{base} {topic}"
+        plan.queries.append(query)
+        for r in self.search_agent.search(query, limit=self.limit_per_topic) or []:
+            url = r.get("url")
+            if not url or url in seen_urls:
+                continue
+            seen_urls.add(url)
+            plan.hints.append(r)
+
+    def _satisfied(self, company: Company, extracted: dict[str, Any], fieldname: str) -> bool:
+        return bool(getattr(company, fieldname, None) or extracted.get(fieldname))
+
+    def _ascii_lower(self, text: str) -> str:
+        return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+
+    def _linkedin_matches(self, url: str, name_tokens: list[str]) -> bool:
+        """Aceita só páginas de empresa cujo slug contém um token do nome (evita a página de concorrentes)."""
+        match = LINKEDIN_RE.search(url)
+        if not match:
+            return False
+        slug = re.sub(r"[^a-z0-9]", "", match.group(1).lower())
+        return any(token in slug for token in name_tokens)
+
+    def _looks_official(self, url: str, name_tokens: list[str]) -> bool:
+        host = (urlparse(url).hostname or "").lower()
+        if not host or any(host == d or host.endswith("." + d) for d in NON_OFFICIAL_DOMAINS):
+            return False
+        return any(token in host for token in name_tokens)
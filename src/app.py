@@ -1,23 +1,47 @@
 """
 CLI para orquestrar scraping, enriquecimento e escrita no Graph DB.
 Este módulo delega a controllers especializados para cada etapa.
+
+Subcomandos: `scrape`, `enrich`, `persist` e `run` (padrão, pipeline completa),
+além do modo distribuído `enqueue` -> `worker` (N processos/hosts) -> `merge`.
+Controllers e suas dependências pesadas (openai, agno, neo4j, bs4, requests)
+só são importados quando a etapa correspondente é usada, então `--help` e
+execuções de uma etapa só não pagam o custo de inicialização das demais.
 """
 
 import argparse
 import os
+import sys
+from functools import cached_property
 
-from controllers.scrape_controller import ScrapeController
-from controllers.enrichment_controller import EnrichmentController
-from controllers.graph_controller import GraphController
 from views.cli import CliView
 
+SCRAPED_PATH = os.path.join("data", "processed", "companies.json")
+ENRICHED_PATH = os.path.join("data", "processed", "enriched.json")
+RUN_DIR = os.path.join("data", "runs", "default")
+
 
 class App:
     def __init__(self) -> None:
         self.view = CliView()
-        self.scrape_controller = ScrapeController(self.view)
-        self.enrichment_controller = EnrichmentController(self.view)
-        self.graph_controller = GraphController(self.view)
+
+    @cached_property
+    def scrape_controller(self):
+        from controllers.scrape_controller import ScrapeController
+
+        return ScrapeController(self.view)
+
+    @cached_property
+    def enrichment_controller(self):
+        from controllers.enrichment_controller import EnrichmentController
+
+        return EnrichmentController(self.view)
+
+    @cached_property
+    def graph_controller(self):
+        from controllers.graph_controller import GraphController
+
+        return GraphController(self.view)
 
     def run(self, limit: int | None = None, use_cache: bool = True) -> None:
         """Pipeline principal: scrape -> enriquecimento -> persistência."""
@@ -27,15 +51,174 @@ class App:
         self.graph_controller.persist(enriched)
         self.view.info("Pipeline concluída")
 
+    def scrape(self, output: str, limit: int | None = None, use_cache: bool = True) -> None:
+        from services.storage.company_store import save_companies
+
+        companies = self.scrape_controller.fetch_companies(limit=limit, use_cache=use_cache)
+        save_companies(output, companies)
+        self.view.info(f"{len(companies)} empresas salvas em {output}")
+
+    def enrich(self, input_path: str, output: str, limit: int | None = None) -> None:
+        from services.storage.company_store import load_companies, save_companies
+
+        companies = load_companies(input_path)
+        if limit:
+            companies = companies[:limit]
+        enriched = self.enrichment_controller.enrich_companies(companies)
+        save_companies(output, enriched)
+        self.view.info(f"{len(enriched)} empresas enriquecidas salvas em {output}")
+
+    def persist(self, input_path: str) -> None:
+        from services.storage.company_store import load_companies
+
+        self.graph_controller.persist(load_companies(input_path))
+
+    def enqueue(self, input_path: str, run_dir: str, shard_size: int, limit: int | None = None) -> None:
+        from services.storage.company_store import load_companies
+
+        companies = load_companies(input_path)
+        if limit:
+            companies = companies[:limit]
+        self.enrichment_controller.enqueue(companies, run_dir, shard_size=shard_size)
+
+    def worker(self, run_dir: str, lease_seconds: float, max_attempts: int = 3) -> bool:
+        """Roda um worker; `False` se algum shard foi abandonado por ele."""
+        _, failed = self.enrichment_controller.run_worker(
+            run_dir, lease_seconds=lease_seconds, max_attempts=max_attempts
+        )
+        return not failed
+
+    def merge(
+        self,
+        run_dir: str,
+        timeout: float | None,
+        lease_seconds: float,
+        idle_timeout: float | None = 900.0,
+        output: str | None = None,
+    ) -> None:
+        """Coordenador: junta o journal dos shards e persiste no grafo."""
+        enriched = self.enrichment_controller.collect(
+            run_dir, timeout=timeout, lease_seconds=lease_seconds, idle_timeout=idle_timeout
+        )
+        if output:
+            from services.storage.company_store import save_companies
+
+            save_companies(output, enriched)
+        self.graph_controller.persist(enriched)
+
+
+def _load_env(env_file: str | None = None) -> None:
+    """Carrega o `.env` uma única vez; python-dotenv é opcional."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    # Com `--env-file`, as chaves desse arquivo têm prioridade (chaves de API por worker)
+    load_dotenv(env_file, override=bool(env_file))
+
+
+def _worker_process(run_dir: str, lease_seconds: float, max_attempts: int, env_file: str | None) -> None:
+    _load_env(env_file)
+    if not App().worker(run_dir, lease_seconds, max_attempts):
+        sys.exit(1)
+
+
+def _shared_options(default) -> tuple[argparse.ArgumentParser, ...]:
+    """Opções aceitas antes ou depois do subcomando.
+
+    Nos subparsers o default é `SUPPRESS`, para não sobrescrever um valor
+    passado antes do subcomando (ex.: `app.py --limit 5 run`).
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--limit", type=int, default=default, help="Limita quantidade de empresas processadas.")
+
+    cache = argparse.ArgumentParser(add_help=False)
+    cache.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False if default is None else default,
+        help="Desabilita cache local do HTML.",
+    )
+
+    neo4j = argparse.ArgumentParser(add_help=False)
+    neo4j.add_argument("--neo4j-uri", type=str, default=default, help="URI do Neo4j (ex.: bolt://localhost:7687).")
+    neo4j.add_argument("--neo4j-user", type=str, default=default, help="Usuário do Neo4j.")
+    neo4j.add_argument("--neo4j-password", type=str, default=default, help="Senha do Neo4j.")
+    return common, cache, neo4j
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"deve ser >= 1 (recebido {value})")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common, cache, neo4j = _shared_options(None)
+    parser = argparse.ArgumentParser(
+        description="Pipeline de scraping, enriquecimento e grafos.",
+        parents=[common, cache, neo4j],
+    )
+    sub = parser.add_subparsers(dest="command")
+    common, cache, neo4j = _shared_options(argparse.SUPPRESS)
+
+    sub.add_parser("run", parents=[common, cache, neo4j], help="Pipeline completa (padrão).")
+
+    scrape = sub.add_parser("scrape", parents=[common, cache], help="Só coleta a lista de empresas.")
+    scrape.add_argument("--output", default=SCRAPED_PATH, help="Arquivo de saída das empresas coletadas.")
+
+    enrich = sub.add_parser("enrich", parents=[common], help="Enriquece empresas de um arquivo de scrape.")
+    enrich.add_argument("--input", default=SCRAPED_PATH, help="Arquivo gerado por `scrape`.")
+    enrich.add_argument("--output", default=ENRICHED_PATH, help="Arquivo de saída das empresas enriquecidas.")
+
+    persist = sub.add_parser("persist", parents=[neo4j], help="Grava no Neo4j empresas de um arquivo enriquecido.")
+    persist.add_argument("--input", default=ENRICHED_PATH, help="Arquivo gerado por `enrich`.")
+
+    run_dir = argparse.ArgumentParser(add_help=False)
+    run_dir.add_argument("--run-dir", default=RUN_DIR, help="Diretório (compartilhado) da fila de shards.")
+    lease = argparse.ArgumentParser(add_help=False, parents=[run_dir])
+    lease.add_argument("--lease-seconds", type=float, default=600.0, help="Validade do lease sem heartbeat.")
+
+    enqueue = sub.add_parser("enqueue", parents=[common, run_dir], help="Divide empresas coletadas em shards.")
+    enqueue.add_argument("--input", default=SCRAPED_PATH, help="Arquivo gerado por `scrape`.")
+    enqueue.add_argument("--shard-size", type=_positive_int, default=50, help="Empresas por shard.")
+
+    worker = sub.add_parser("worker", parents=[lease], help="Processa shards da fila até ela acabar.")
+    worker.add_argument(
+        "--processes",
+        type=_positive_int,
+        default=None,
+        help="Quantidade de processos worker neste host (padrão: um por --env-file).",
+    )
+    worker.add_argument(
+        "--env-file",
+        action="append",
+        default=[],
+        help="Arquivo .env com as chaves de API de um processo; repita para dar chaves próprias a cada processo.",
+    )
+    worker.add_argument(
+        "--max-attempts",
+        type=_positive_int,
+        default=3,
+        help="Tentativas com erro antes de abandonar um shard em failed/.",
+    )
+
+    merge = sub.add_parser("merge", parents=[neo4j, lease], help="Junta os shards concluídos e grava no Neo4j.")
+    merge.add_argument("--timeout", type=float, default=None, help="Tempo máximo de espera pelos workers (s).")
+    merge.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=900.0,
+        help="Desiste após este tempo (s) com shards pendentes e nenhum worker ativo.",
+    )
+    merge.add_argument("--output", default=None, help="Também salva as empresas enriquecidas neste arquivo.")
+    return parser
+
 
 def main():
-    parser = argparse.ArgumentParser(description="Pipeline de scraping, enriquecimento e grafos.")
-    parser.add_argument("--limit", type=int, default=None, help="Limita quantidade de empresas processadas.")
-    parser.add_argument("--no-cache", action="store_true", help="Desabilita cache local do HTML.")
-    parser.add_argument("--neo4j-uri", type=str, default=None, help="URI do Neo4j (ex.: bolt://localhost:7687).")
-    parser.add_argument("--neo4j-user", type=str, default=None, help="Usuário do Neo4j.")
-    parser.add_argument("--neo4j-password", type=str, default=None, help="Senha do Neo4j.")
-    args = parser.parse_args()
+    args = build_parser().parse_args()
+    _load_env()
 
     # Override de configs via CLI (prioridade acima do .env)
     if args.neo4j_uri:
@@ -46,7 +229,55 @@ def main():
         os.environ["NEO4J_PASSWORD"] = args.neo4j_password
 
     app = App()
-    app.run(limit=args.limit, use_cache=not args.no_cache)
+    command = args.command or "run"
+    if command == "scrape":
+        app.scrape(args.output, limit=args.limit, use_cache=not args.no_cache)
+    elif command == "enrich":
+        app.enrich(args.input, args.output, limit=args.limit)
+    elif command == "persist":
+        app.persist(args.input)
+    elif command == "enqueue":
+        app.enqueue(args.input, args.run_dir, args.shard_size, limit=args.limit)
+    elif command == "worker":
+        env_files = args.env_file
+        processes = args.processes or max(1, len(env_files))
+        if processes > max(1, len(env_files)):
+            # Token buckets são por processo: processos com as mesmas chaves somam a taxa por chave
+            app.view.warn(
+                f"{processes} processos e {len(env_files)} --env-file: processos que compartilham chaves de API "
+                "multiplicam a taxa enviada por chave. Use um --env-file por processo."
+            )
+        if processes > 1:
+            import multiprocessing
+
+            procs = [
+                multiprocessing.Process(
+                    target=_worker_process,
+                    args=(
+                        args.run_dir,
+                        args.lease_seconds,
+                        args.max_attempts,
+                        env_files[i % len(env_files)] if env_files else None,
+                    ),
+                )
+                for i in range(processes)
+            ]
+            for proc in procs:
+                proc.start()
+            for proc in procs:
+                proc.join()
+            failed = [proc.pid for proc in procs if proc.exitcode != 0]
+            if failed:
+                app.view.error(f"{len(failed)} de {processes} processos worker terminaram com erro: {failed}")
+                sys.exit(1)
+        else:
+            _load_env(env_files[0] if env_files else None)
+            if not app.worker(args.run_dir, args.lease_seconds, args.max_attempts):
+                sys.exit(1)
+    elif command == "merge":
+        app.merge(args.run_dir, args.timeout, args.lease_seconds, idle_timeout=args.idle_timeout, output=args.output)
+    else:
+        app.run(limit=args.limit, use_cache=not args.no_cache)
 
 
 if __name__ == "__main__":
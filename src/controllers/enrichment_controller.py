@@ -1,6 +1,18 @@
-"""Controller que orquestra enriquecimento via agentes."""
+"""Controller que orquestra enriquecimento via agentes.
+
+Além do modo em processo único (`enrich_companies`), suporta um modo
+fila: `enqueue` divide as empresas em shards num diretório compartilhado,
+vários workers (`run_worker`, em processos ou hosts diferentes, cada um
+com suas chaves de API) pegam shards por lease, e `collect` junta o
+journal de resultados para a persistência.
+"""
+
+import threading
+import time
 
 from agents.orchestrator_agent import OrchestratorAgent
+from services.storage.payload_store import PayloadStore
+from services.storage.shard_queue import ShardQueue, default_worker_id
 
 
 class EnrichmentController:
@@ -11,5 +23,131 @@ class EnrichmentController:
     def enrich_companies(self, companies):
         self.view.info("Iniciando enriquecimento por agentes")
         enriched = self.agent.enrich_batch(companies)
+        self.agent.search_agent.log_stats()
         self.view.info("Enriquecimento concluído")
         return enriched
+
+    def enqueue(self, companies, run_dir: str, shard_size: int = 50) -> ShardQueue:
+        queue = ShardQueue(run_dir)
+        total = queue.create(companies, shard_size=shard_size)
+        self.view.info(f"{len(companies)} empresas divididas em {total} shards em {run_dir}")
+        return queue
+
+    def run_worker(
+        self,
+        run_dir: str,
+        worker_id: str | None = None,
+        lease_seconds: float = 600.0,
+        poll_seconds: float = 5.0,
+        wait_for_queue: float = 300.0,
+        max_attempts: int = 3,
+    ) -> tuple[int, int]:
+        """Processa shards até a fila acabar.
+
+        Devolve `(concluídos, abandonados)` por este worker. Erro num shard não
+        derruba o worker: o shard volta para a fila e, após `max_attempts`
+        erros, é abandonado em `failed/`.
+        """
+        queue = ShardQueue(run_dir, lease_seconds=lease_seconds, max_attempts=max_attempts)
+        worker_id = worker_id or default_worker_id()
+        processed = failed = 0
+        if not self._wait_ready(queue, wait_for_queue, poll_seconds):
+            self.view.warn(f"Worker {worker_id}: nenhuma fila em {run_dir} após {wait_for_queue:.0f}s; encerrando")
+            return 0, 0
+        # Payloads (saída crua do LLM) no diretório compartilhado, para que as
+        # referências gravadas no journal sejam legíveis pelo coordenador.
+        self.agent.payload_store = PayloadStore(queue.payloads_dir)
+        self.view.info(f"Worker {worker_id} iniciado em {run_dir}")
+        while not queue.is_done():
+            lease = queue.claim(worker_id)
+            if lease is None:
+                # Nada pendente: tenta recuperar leases expirados e espera os demais workers
+                if not queue.reclaim_expired():
+                    time.sleep(poll_seconds)
+                continue
+            self.view.info(f"Worker {worker_id} processando {lease.shard} ({len(lease.companies)} empresas)")
+            stop = threading.Event()
+            beat = threading.Thread(
+                target=self._heartbeat, args=(queue, lease, stop, lease_seconds / 3), daemon=True
+            )
+            beat.start()
+            try:
+                enriched = self.agent.enrich_batch(lease.companies)
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                if queue.fail(lease, error):
+                    failed += 1
+                    self.view.error(f"Worker {worker_id}: {lease.shard} abandonado após {max_attempts} tentativas ({error})")
+                else:
+                    self.view.warn(f"Worker {worker_id}: erro em {lease.shard}, devolvido para a fila ({error})")
+                continue
+            finally:
+                stop.set()
+                beat.join()
+            if not queue.complete(lease, enriched):
+                self.view.warn(f"Worker {worker_id}: lease de {lease.shard} perdido; resultado descartado")
+                continue
+            processed += 1
+            self.view.info(f"Worker {worker_id}: {lease.shard} concluído {queue.progress()}")
+        self.agent.search_agent.log_stats()
+        self.view.info(f"Worker {worker_id} finalizado: {processed} shards, {failed} abandonados")
+        return processed, failed
+
+    def collect(
+        self,
+        run_dir: str,
+        timeout: float | None = None,
+        poll_seconds: float = 10.0,
+        lease_seconds: float = 600.0,
+        idle_timeout: float | None = 900.0,
+    ):
+        """Aguarda todos os shards e devolve as empresas enriquecidas do journal.
+
+        Além do `timeout` total, desiste após `idle_timeout` segundos com shards
+        pendentes e nenhum lease ativo (nenhum worker rodando). Shards
+        abandonados em `failed/` são reportados e ficam fora do resultado.
+        """
+        queue = ShardQueue(run_dir, lease_seconds=lease_seconds)
+        if not queue.ready():
+            raise FileNotFoundError(f"Nenhuma fila em {run_dir}; rode `enqueue` antes")
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        idle_since = None
+        while not queue.is_done():
+            now = time.monotonic()
+            if deadline is not None and now > deadline:
+                raise TimeoutError(f"Shards incompletos em {run_dir}: {queue.progress()}")
+            reclaimed = queue.reclaim_expired()
+            if reclaimed:
+                self.view.warn(f"{reclaimed} leases expirados devolvidos para a fila")
+            progress = queue.progress()
+            idle_since = (idle_since or now) if not progress["leased"] else None
+            if idle_timeout is not None and idle_since is not None and now - idle_since > idle_timeout:
+                raise TimeoutError(f"Nenhum worker ativo há {idle_timeout:.0f}s em {run_dir}: {progress}")
+            self.view.info(f"Aguardando workers: {progress}")
+            time.sleep(poll_seconds)
+        failures = queue.failures()
+        for failure in failures:
+            last = failure["errors"][-1]["error"] if failure.get("errors") else "?"
+            self.view.error(f"{failure['shard']} abandonado após {failure['attempts']} tentativas: {last}")
+        companies = list(queue.results())
+        self.view.info(
+            f"{len(companies)} empresas enriquecidas coletadas de {queue.total_shards} shards "
+            f"({len(failures)} abandonados)"
+        )
+        return companies
+
+    def _wait_ready(self, queue: ShardQueue, timeout: float, poll_seconds: float) -> bool:
+        """Espera o `enqueue` terminar (manifest gravado) por até `timeout` segundos."""
+        deadline = time.monotonic() + timeout
+        while not queue.ready():
+            if time.monotonic() > deadline:
+                return False
+            self.view.info(f"Aguardando fila em {queue.run_dir}")
+            time.sleep(poll_seconds)
+        return True
+
+    def _heartbeat(self, queue: ShardQueue, lease, stop: threading.Event, interval: float) -> None:
+        while not stop.wait(interval):
+            if not queue.heartbeat(lease):
+                self.view.warn(f"Lease de {lease.shard} expirou e foi reclamado; o shard será refeito por outro worker")
+                return
@@ -0,0 +1,21 @@
+"""Helpers para internar strings repetidas (setores, produtos, marcas).
+
+Em 10k+ empresas os mesmos setores e categorias de produto se repetem
+milhares de vezes; `sys.intern` faz todas as ocorrências apontarem para
+um único objeto.
+"""
+
+import sys
+from typing import Iterable, Optional
+
+
+def intern_str(value: Optional[str]) -> Optional[str]:
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def intern_list(values: Optional[Iterable]) -> list:
+    if not values:
+        return []
+    return [intern_str(v) for v in values]
@@ -3,11 +3,18 @@
 from dataclasses import dataclass, field
 from typing import Optional
 
+from ._interning import intern_list, intern_str
 
-@dataclass
+
+@dataclass(slots=True)
 class Brand:
     name: str
     cnpjs: list[str] = field(default_factory=list)
     products: list[str] = field(default_factory=list)
     description: Optional[str] = None
     parent_company: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        self.name = intern_str(self.name)
+        self.products = intern_list(self.products)
+        self.parent_company = intern_str(self.parent_company)
@@ -1,10 +1,12 @@
 """Representa uma empresa no domínio do grafo."""
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import List, Optional
 
+from ._interning import intern_list, intern_str
 
-@dataclass
+
+@dataclass(slots=True)
 class Company:
     name: str
     revenue: Optional[float] = None
@@ -17,7 +19,23 @@ class Company:
     brands: list["Brand"] = field(default_factory=list)
     products: list[str] = field(default_factory=list)
     group: Optional[str] = None  # nome do grupo econômico ou holding
-    meta: dict = field(default_factory=dict)  # atributos livres
+    meta: dict = field(default_factory=dict)  # atributos livres (payloads brutos ficam no PayloadStore)
+
+    def __post_init__(self) -> None:
+        self.sector = intern_str(self.sector)
+        self.products = intern_list(self.products)
+        self.group = intern_str(self.group)
+
+    def to_dict(self) -> dict:
+        """Substitui `__dict__` (inexistente com slots) para montar payloads."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Company":
+        """Reconstrói a empresa (e suas marcas) a partir de `to_dict`."""
+        data = dict(data)
+        data["brands"] = [b if isinstance(b, Brand) else Brand(**b) for b in data.get("brands") or []]
+        return cls(**data)
 
 
 # Evita import circular em tempo de tipo
@@ -1,12 +1,31 @@
-"""Agent LLM para interpretar e normalizar dados de empresas."""
+"""Agent LLM para interpretar e normalizar dados de empresas.
 
+Quando o provedor aceita, pede saída no modo strict de JSON schema
+(`RESPONSE_FORMAT_STRICT`), o que torna o reparo de JSON raro. A resposta
+passa por um único parse tolerante e pela coerção de `schema.py`; as
+contagens de parse direto/reparo/falha ficam em `parse_stats` e o tempo
+gasto no caminho de reparo em `repair_seconds`.
+"""
+
+import json
+import time
 from typing import Any
 
+try:
+    import json_repair
+except Exception:  # pragma: no cover - tolera ausência de json_repair
+    json_repair = None
+
+from services.enrichment.schema import RESPONSE_FORMAT_STRICT, coerce_enrichment
+
 
 class LlmEnricher:
-    def __init__(self, llm_client: Any, view=None) -> None:
+    def __init__(self, llm_client: Any, view=None, strict_schema: bool = True) -> None:
         self.llm = llm_client
         self.view = view
+        self.strict_schema = strict_schema
+        self.parse_stats = {"direct": 0, "repaired": 0, "failed": 0}
+        self.repair_seconds = 0.0
 
     def enrich(self, company: dict) -> dict:
         if not self.llm:
@@ -15,16 +34,7 @@ class LlmEnricher:
 
         system_prompt, user_prompt = self._build_prompt(company)
         try:
-            response = self.llm.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                max_tokens=900,
-                temperature=0.2,
-                response_format={"type": "json_object"},
-            )
+            response = self._create(system_prompt, user_prompt)
             content = response.choices[0].message.content or ""
             if self.view:
                 self.view.info(f"LLM output bruto para {company.get('name')}: {content[:200]}")
@@ -35,6 +45,53 @@ class LlmEnricher:
             # Falha no LLM: devolve dados originais para manter robustez.
             return company
 
+    def validate(self, data: Any) -> dict:
+        """Coerção da resposta (LLM ou Agno) para os formatos esperados por `Company`/`Brand`."""
+        return coerce_enrichment(data)
+
+    def log_stats(self) -> None:
+        if not self.view:
+            return
+        s = self.parse_stats
+        total = sum(s.values())
+        self.view.info(
+            f"Parse LLM: {total} respostas, {s['direct']} diretas, "
+            f"{s['repaired']} reparadas, {s['failed']} falhas "
+            f"({self.repair_seconds * 1000:.1f} ms no caminho de reparo)"
+        )
+
+    def _create(self, system_prompt: str, user_prompt: str):
+        kwargs = dict(
+            model="gpt-4.1-mini",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=900,
+            temperature=0.2,
+        )
+        if self.strict_schema:
+            try:
+                return self.llm.chat.completions.create(response_format=RESPONSE_FORMAT_STRICT, **kwargs)
+            except Exception as exc:
+                # Só um 400 sobre response_format/json_schema indica falta de suporte;
+                # outros erros (ex.: context_length_exceeded) sobem e caem no fallback do `enrich`
+                if not self._is_schema_unsupported(exc):
+                    raise
+                # Provedor/modelo sem suporte: volta ao json_object nas próximas chamadas
+                self.strict_schema = False
+                if self.view:
+                    self.view.warn(f"Modo strict de JSON schema indisponível ({exc}); usando json_object.")
+        return self.llm.chat.completions.create(response_format={"type": "json_object"}, **kwargs)
+
+    def _is_schema_unsupported(self, exc: Exception) -> bool:
+        if getattr(exc, "status_code", None) != 400:
+            return False
+        details = " ".join(
+            str(part) for part in (getattr(exc, "param", None), getattr(exc, "code", None), getattr(exc, "message", exc))
+        ).lower()
+        return "response_format" in details or "json_schema" in details
+
     def _build_prompt(self, company: dict) -> tuple[str, str]:
         hints = company.get("hints") or []
         hints_text = "\n".join(
@@ -70,33 +127,49 @@ class LlmEnricher:
         return system_prompt, user_prompt
 
     def _safe_parse(self, content: str, fallback: dict) -> dict:
-        import json
+        """Parse tolerante: `json.loads` direto; se falhar, o trecho `{...}` e, por último, `json_repair`."""
+        try:
+            parsed = json.loads(content)
+            self.parse_stats["direct"] += 1
+            return self.validate(parsed)
+        except ValueError as exc:
+            error = exc
 
+        repair_start = time.perf_counter()
         try:
-            return json.loads(content)
-        except Exception as exc:
-            # Tenta corrigir JSON parcial/truncado
+            repaired = self._repair(content)
+        finally:
+            self.repair_seconds += time.perf_counter() - repair_start
+        if repaired is not None:
+            self.parse_stats["repaired"] += 1
+            return self.validate(repaired)
+
+        self.parse_stats["failed"] += 1
+        if self.view:
+            self.view.warn(f"Falha ao parsear JSON para {fallback.get('name')}: {error}")
+        # devolve fallback com conteúdo bruto para inspeção
+        fb = dict(fallback)
+        meta = fb.get("meta") or {}
+        meta["_raw_content"] = content
+        fb["meta"] = meta
+        return fb
+
+    def _repair(self, content: str) -> dict | None:
+        """Caminho de reparo: cerca de markdown/texto ao redor do `{...}` e JSON truncado."""
+        start, end = content.find("{"), content.rfind("}")
+        candidate = content[start : end + 1] if start != -1 and end > start else content
+        if candidate != content:
             try:
-                start = content.find("{")
-                end = content.rfind("}")
-                if start != -1 and end != -1:
-                    cleaned = content[start : end + 1]
-                    return json.loads(cleaned)
-            except Exception:
+                parsed = json.loads(candidate)
+                if isinstance(parsed, dict):
+                    return parsed
+            except ValueError:
                 pass
-            # Tenta reparar JSON com json_repair, se disponível
+        if json_repair is not None:
             try:
-                import json_repair
-
-                repaired = json_repair.loads(content)
-                return repaired
+                repaired = json_repair.loads(candidate)
+                if isinstance(repaired, dict) and repaired:
+                    return repaired
             except Exception:
                 pass
-            if self.view:
-                self.view.warn(f"Falha ao parsear JSON para {fallback.get('name')}: {exc}")
-            # devolve fallback com conteúdo bruto para inspeção
-            fb = dict(fallback)
-            meta = fb.get("meta") or {}
-            meta["_raw_content"] = content
-            fb["meta"] = meta
-            return fb
+        return None
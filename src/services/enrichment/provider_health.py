@@ -0,0 +1,182 @@
+"""Saúde dos provedores de busca: rate limit, circuit breaker e métricas.
+
+Cada provedor (Tavily, DuckDuckGo) ganha um `ProviderHealth` que guarda
+latência/erro recentes, um token bucket para respeitar limites de taxa e
+um circuit breaker que corta o provedor por um tempo após falhas seguidas.
+Assim um provedor degradado custa milissegundos (chamada pulada) em vez
+do timeout completo em cada uma das milhares de buscas.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class TokenBucket:
+    """Token bucket simples (thread-safe) para limitar chamadas por segundo."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, max_wait: float = 0.0) -> bool:
+        """Consome um token, aguardando no máximo `max_wait` segundos."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else max_wait
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Circuit breaker clássico: closed -> open -> half-open -> closed."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            # Half-open: libera uma única chamada de teste
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ProviderHealth:
+    """Agrega breaker, rate limit e métricas recentes de um provedor."""
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_sec: float = 2.0,
+        burst: Optional[float] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        window: int = 50,
+        window_seconds: float = 120.0,
+        min_samples: int = 5,
+    ) -> None:
+        self.name = name
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        # Amostras (instante, sucesso, latência); só as dos últimos `window_seconds`
+        # contam, para que um provedor rebaixado volte a ser tentado quando as falhas envelhecem.
+        self._samples: deque[tuple[float, bool, float]] = deque(maxlen=window)
+        self.window_seconds = window_seconds
+        # Abaixo disso a taxa de erro não rebaixa o provedor (uma busca com
+        # timeout sozinha já gera várias amostras de falha pelos retries)
+        self.min_samples = min_samples
+        self.stats = {"calls": 0, "successes": 0, "failures": 0, "empty": 0, "skipped": 0, "retries": 0}
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool, latency: float, empty: bool = False) -> None:
+        with self._lock:
+            self.stats["calls"] += 1
+            self._samples.append((time.monotonic(), ok, latency))
+            if ok:
+                self.stats["successes"] += 1
+                if empty:
+                    self.stats["empty"] += 1
+            else:
+                self.stats["failures"] += 1
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def record_skip(self) -> None:
+        with self._lock:
+            self.stats["skipped"] += 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.stats["retries"] += 1
+
+    def _recent(self) -> list[tuple[float, bool, float]]:
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            return [sample for sample in self._samples if sample[0] >= cutoff]
+
+    @property
+    def error_rate(self) -> float:
+        recent = self._recent()
+        if not recent:
+            return 0.0
+        return 1 - sum(ok for _, ok, _ in recent) / len(recent)
+
+    @property
+    def avg_latency(self) -> float:
+        recent = self._recent()
+        if not recent:
+            return 0.0
+        return sum(latency for _, _, latency in recent) / len(recent)
+
+    def route_key(self, priority: int) -> tuple:
+        """Chave de ordenação (menor é melhor).
+
+        Circuito aberto vai para o fim; depois pesa a taxa de erro recente em
+        faixas de 25% (só com `min_samples` amostras na janela), a prioridade
+        declarada e, só como desempate, a latência.
+        """
+        error_tier = int(self.error_rate * 4) if len(self._recent()) >= self.min_samples else 0
+        return (
+            self.breaker.state != CircuitBreaker.CLOSED,
+            error_tier,
+            priority,
+            self.avg_latency,
+        )
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"{self.name}: estado={self.breaker.state} chamadas={s['calls']} ok={s['successes']} "
+            f"vazias={s['empty']} falhas={s['failures']} retries={s['retries']} puladas={s['skipped']} "
+            f"latência média={self.avg_latency:.2f}s erro={self.error_rate:.0%}"
+        )
@@ -0,0 +1,188 @@
+"""Schema da saída de enriquecimento e coerção para os formatos de `Company`/`Brand`.
+
+`ENRICHMENT_JSON_SCHEMA` é enviado ao provedor no modo strict
+(`response_format={"type": "json_schema", ...}`). `coerce_enrichment`
+normaliza qualquer resposta (LLM, Agno ou fallback) antes do `_merge`,
+para que formatos errados (marcas como string, produtos como dict)
+não estourem mais tarde na escrita do Neo4j.
+"""
+
+import re
+import unicodedata
+from typing import Any, Callable
+
+# Tipos de relação e labels aceitos; ambos são interpolados no texto Cypher
+# pelo GraphBuilder, então nada fora destas listas pode passar. Vale para
+# todos os caminhos (strict, json_object e Agno): tipo desconhecido vira RELATED_TO.
+RELATION_TYPES = ["RELATED_TO", "SIMILAR_TO", "OWNS", "GROUP_WITH", "SUBSIDIARY_OF", "INVESTOR_IN", "PARTNER_OF"]
+RELATION_LABELS = ["Company", "Holding", "Brand"]
+
+_NULLABLE_STR = {"type": ["string", "null"]}
+_STR_LIST = {"type": "array", "items": {"type": "string"}}
+
+
+def _object(properties: dict) -> dict:
+    # Modo strict exige todas as chaves em `required` e sem propriedades extras
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+ENRICHMENT_JSON_SCHEMA = _object(
+    {
+        "website": _NULLABLE_STR,
+        "linkedin": _NULLABLE_STR,
+        "other_socials": _STR_LIST,
+        "cnpjs": _STR_LIST,
+        "addresses": _STR_LIST,
+        "description": _NULLABLE_STR,
+        "brands": {
+            "type": "array",
+            "items": _object({"name": {"type": "string"}, "cnpjs": _STR_LIST, "products": _STR_LIST}),
+        },
+        "products": _STR_LIST,
+        "group": _NULLABLE_STR,
+        "investors": _STR_LIST,
+        "relations": {
+            "type": "array",
+            "items": _object(
+                {
+                    "target": {"type": "string"},
+                    "type": {"type": "string", "enum": RELATION_TYPES},
+                    "label": {"type": "string", "enum": RELATION_LABELS},
+                }
+            ),
+        },
+        "meta": _object({"confidence": {"type": ["number", "null"]}, "sources": _STR_LIST}),
+    }
+)
+
+RESPONSE_FORMAT_STRICT = {
+    "type": "json_schema",
+    "json_schema": {"name": "company_enrichment", "strict": True, "schema": ENRICHMENT_JSON_SCHEMA},
+}
+
+
+def _to_str(value: Any) -> str | None:
+    if isinstance(value, list):
+        value = next((v for v in value if v), None)
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("url") or value.get("value")
+    if value is None or isinstance(value, bool):
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _flatten(value: Any) -> list:
+    """Achata listas/dicts aninhados; em dicts usa os valores, ou a chave quando o valor não é texto/coleção."""
+    if isinstance(value, dict):
+        items = []
+        for key, item in value.items():
+            items.extend(_flatten(item) if isinstance(item, (str, list, tuple, set, dict)) else [key])
+        return items
+    if isinstance(value, (list, tuple, set)):
+        return [leaf for item in value for leaf in (_flatten(item) if isinstance(item, (list, tuple, set)) else [item])]
+    return [value]
+
+
+def _to_str_list(value: Any) -> list[str]:
+    if value is None:
+        return []
+    seen: dict[str, None] = {}
+    for item in _flatten(value):
+        text = _to_str(item)
+        if text:
+            seen.setdefault(text, None)
+    return list(seen)
+
+
+def _to_brands(value: Any) -> list[dict]:
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        # {"Marca": {...}} ou {"name": ...} isolado
+        value = [value] if "name" in value else [{"name": k, **(v if isinstance(v, dict) else {})} for k, v in value.items()]
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    brands: dict[str, dict] = {}
+    for item in value:
+        if isinstance(item, dict):
+            name = _to_str(item.get("name"))
+            cnpjs, products = _to_str_list(item.get("cnpjs")), _to_str_list(item.get("products"))
+        else:
+            name, cnpjs, products = _to_str(item), [], []
+        if name and name not in brands:
+            brands[name] = {"name": name, "cnpjs": cnpjs, "products": products}
+    return list(brands.values())
+
+
+def normalize_relation_type(value: Any) -> str:
+    """Normaliza o tipo (ex.: `owns` -> `OWNS`); fora de `RELATION_TYPES` vira `RELATED_TO`."""
+    text = unicodedata.normalize("NFKD", _to_str(value) or "").encode("ascii", "ignore").decode()
+    text = re.sub(r"[^A-Z]+", "_", text.upper()).strip("_")
+    return text if text in RELATION_TYPES else "RELATED_TO"
+
+
+def normalize_relation_label(value: Any) -> str:
+    text = (_to_str(value) or "").lower()
+    return next((label for label in RELATION_LABELS if label.lower() == text), "Company")
+
+
+def _to_relations(value: Any) -> list:
+    if not isinstance(value, (list, tuple)):
+        value = [value] if value else []
+    relations = []
+    for item in value:
+        if isinstance(item, str) and item.strip():
+            relations.append(item.strip())
+        elif isinstance(item, dict) and _to_str(item.get("target")):
+            relations.append(
+                {
+                    "target": _to_str(item.get("target")),
+                    "type": normalize_relation_type(item.get("type")),
+                    "label": normalize_relation_label(item.get("label")),
+                }
+            )
+    return relations
+
+
+def _to_meta(value: Any) -> dict:
+    return dict(value) if isinstance(value, dict) else {}
+
+
+# Tabela montada uma vez no import: chave -> função de coerção
+FIELD_COERCERS: dict[str, Callable[[Any], Any]] = {
+    "website": _to_str,
+    "linkedin": _to_str,
+    "description": _to_str,
+    "group": _to_str,
+    "other_socials": _to_str_list,
+    "cnpjs": _to_str_list,
+    "addresses": _to_str_list,
+    "products": _to_str_list,
+    "investors": _to_str_list,
+    "brands": _to_brands,
+    "relations": _to_relations,
+    "meta": _to_meta,
+}
+
+
+def coerce_enrichment(data: Any) -> dict:
+    """Normaliza a resposta; só devolve chaves presentes e não vazias.
+
+    No modo strict toda chave vem preenchida (`null`, `[]`); descartar esses
+    valores evita que o `_merge` apague dados do scraping ou da extração local.
+    """
+    if not isinstance(data, dict):
+        return {}
+    coerced = {}
+    for key, coerce in FIELD_COERCERS.items():
+        if key in data:
+            value = coerce(data[key])
+            if value not in (None, "", [], {}):
+                coerced[key] = value
+    return coerced
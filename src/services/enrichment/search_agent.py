@@ -2,74 +2,125 @@
 
 Fluxo: tenta Tavily se `TAVILY_API_KEY` estiver definido; caso contrário,
 usa um fallback sem credenciais via DuckDuckGo HTML.
+
+Cada provedor tem saúde própria (`ProviderHealth`): rate limit por token
+bucket, retries com backoff exponencial e circuit breaker. A ordem de
+tentativa é decidida pela taxa de erro recente (janela de tempo), com a
+latência só como desempate, e provedores com o circuito aberto são
+pulados sem custo de timeout.
 """
 
 import os
-from typing import Any
+import random
+import time
+from typing import Any, Callable
 
 import requests
-from bs4 import BeautifulSoup
-from dotenv import load_dotenv
 
-load_dotenv()
+from services.enrichment.provider_health import ProviderHealth
 
 
 class SearchAgent:
-    def __init__(self, view=None) -> None:
+    def __init__(
+        self,
+        view=None,
+        timeout: float = 8.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+    ) -> None:
         self.view = view
         self.api_key = os.getenv("TAVILY_API_KEY")
         self.tavily_endpoint = "https://api.tavily.com/search"
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.providers: list[tuple[ProviderHealth, Callable[[str, int], list[dict[str, Any]]]]] = []
+        if self.api_key:
+            self.providers.append((ProviderHealth("tavily", rate_per_sec=5.0, burst=10), self._search_tavily))
+        self.providers.append((ProviderHealth("duckduckgo", rate_per_sec=1.0, burst=3), self._search_duckduckgo))
         self._log_key_masked()
 
     def search(self, query: str, limit: int = 3) -> list[dict[str, Any]]:
-        if self.api_key:
-            results = self._search_tavily(query, limit)
+        for health, provider in self._route():
+            if not health.breaker.allow():
+                health.record_skip()
+                continue
+            results = self._call_with_retries(health, provider, query, limit)
             if results:
                 return results
-        return self._search_duckduckgo(query, limit)
-
-    def search_multi(self, base: str, topics: list[str], limit_per_topic: int = 2) -> list[dict[str, Any]]:
-        """Executa buscas temáticas e consolida resultados."""
-        all_results = []
-        seen_urls = set()
-        for topic in topics:
-            q = f"{base} {topic}"
-            results = self.search(q, limit=limit_per_topic) or []
-            for r in results:
-                url = r.get("url")
-                if not url or url in seen_urls:
-                    continue
-                seen_urls.add(url)
-                all_results.append(r)
-        return all_results
+        return []
+
+    def log_stats(self) -> None:
+        """Reporta chamadas feitas, puladas e falhas por provedor."""
+        if not self.view:
+            return
+        for health, _ in self.providers:
+            self.view.info(f"Busca {health.summary()}")
+
+    def _route(self):
+        """Ordena provedores por estado do breaker, erro recente e prioridade declarada.
+
+        A ordem de `self.providers` é a prioridade: Tavily segue na frente
+        enquanto saudável, e a latência só desempata provedores equivalentes.
+        """
+        ranked = sorted(
+            enumerate(self.providers),
+            key=lambda item: item[1][0].route_key(item[0]),
+        )
+        return [entry for _, entry in ranked]
+
+    def _call_with_retries(self, health: ProviderHealth, provider, query: str, limit: int) -> list[dict[str, Any]]:
+        for attempt in range(self.max_retries + 1):
+            # Toda tentativa (inclusive retries após 429/5xx) consome um token do bucket
+            if not health.bucket.acquire(max_wait=self.timeout):
+                health.record_skip()
+                return []
+            start = time.monotonic()
+            try:
+                results = provider(query, limit)
+            except Exception as exc:
+                health.record(ok=False, latency=time.monotonic() - start)
+                if not self._is_retryable(exc) or attempt == self.max_retries or not health.breaker.allow():
+                    if self.view:
+                        self.view.warn(f"Busca via {health.name} falhou para '{query}': {exc}")
+                    return []
+                health.record_retry()
+                time.sleep(self.backoff_base * (2**attempt) + random.uniform(0, self.backoff_base))
+                continue
+            health.record(ok=True, latency=time.monotonic() - start, empty=not results)
+            return results
+        return []
+
+    def _is_retryable(self, exc: Exception) -> bool:
+        if isinstance(exc, requests.HTTPError) and exc.response is not None:
+            status = exc.response.status_code
+            return status == 429 or status >= 500
+        return isinstance(exc, requests.RequestException)
 
     def _search_tavily(self, query: str, limit: int) -> list[dict[str, Any]]:
-        try:
-            resp = requests.post(
-                self.tavily_endpoint,
-                json={
-                    "api_key": self.api_key,
-                    "query": query,
-                    "max_results": limit,
-                    "include_domains": [],
-                    "search_depth": "basic",
-                },
-                timeout=15,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            results = data.get("results") or []
-            return [
-                {
-                    "title": r.get("title"),
-                    "url": r.get("url"),
-                    "content": r.get("content"),
-                }
-                for r in results
-                if r.get("url")
-            ]
-        except Exception:
-            return []
+        resp = requests.post(
+            self.tavily_endpoint,
+            json={
+                "api_key": self.api_key,
+                "query": query,
+                "max_results": limit,
+                "include_domains": [],
+                "search_depth": "basic",
+            },
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        results = data.get("results") or []
+        return [
+            {
+                "title": r.get("title"),
+                "url": r.get("url"),
+                "content": r.get("content"),
+            }
+            for r in results
+            if r.get("url")
+        ]
 
     def _log_key_masked(self):
         if not self.view:
@@ -82,25 +133,24 @@ class SearchAgent:
 
     def _search_duckduckgo(self, query: str, limit: int) -> list[dict[str, Any]]:
         """Fallback sem credenciais usando DuckDuckGo HTML."""
-        try:
-            resp = requests.get(
-                "https://duckduckgo.com/html",
-                params={"q": query, "kl": "br-pt"},
-                headers={"User-Agent": "Mozilla/5.0"},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, "html.parser")
-            results = []
-            for a in soup.select("a.result__a")[:limit]:
-                title = a.get_text(strip=True)
-                url = a.get("href")
-                snippet_el = a.find_parent("div", class_="result__body")
-                snippet = ""
-                if snippet_el:
-                    snippet = snippet_el.get_text(" ", strip=True)
-                if url:
-                    results.append({"title": title, "url": url, "content": snippet})
-            return results
-        except Exception:
-            return []
+        resp = requests.get(
+            "https://duckduckgo.com/html",
+            params={"q": query, "kl": "br-pt"},
+            headers={"User-Agent": "Mozilla/5.0"},
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(resp.text, "html.parser")
+        results = []
+        for a in soup.select("a.result__a")[:limit]:
+            title = a.get_text(strip=True)
+            url = a.get("href")
+            snippet_el = a.find_parent("div", class_="result__body")
+            snippet = ""
+            if snippet_el:
+                snippet = snippet_el.get_text(" ", strip=True)
+            if url:
+                results.append({"title": title, "url": url, "content": snippet})
+        return results
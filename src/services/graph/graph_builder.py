@@ -3,6 +3,7 @@
 from typing import Iterable
 
 from models.company import Company
+from services.enrichment.schema import RELATION_LABELS, RELATION_TYPES
 from services.graph.neo4j_client import Neo4jClient
 
 
@@ -100,6 +101,9 @@ class GraphBuilder:
                 continue
             if not target_name:
                 continue
+            if rel_type not in RELATION_TYPES or label not in RELATION_LABELS:
+                self.view.warn(f"Relação ignorada para {company.name}: tipo={rel_type!r} label={label!r}")
+                continue
             self._merge_relation(company.name, target_name, rel_type, label)
 
     def _merge_relation(self, source_name: str, target_name: str, rel_type: str, target_label: str) -> None:
@@ -1,18 +1,25 @@
 """Wrapper simples para conexão com Neo4j."""
 
 import os
-from neo4j import GraphDatabase
+from functools import cached_property
 
 
 class Neo4jClient:
     def __init__(self) -> None:
-        uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-        user = os.getenv("NEO4J_USER", "neo4j")
-        password = os.getenv("NEO4J_PASSWORD", "password")
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+        self.user = os.getenv("NEO4J_USER", "neo4j")
+        self.password = os.getenv("NEO4J_PASSWORD", "password")
+
+    @cached_property
+    def driver(self):
+        """Driver criado na primeira query (importa `neo4j` só nesse momento)."""
+        from neo4j import GraphDatabase
+
+        return GraphDatabase.driver(self.uri, auth=(self.user, self.password))
 
     def close(self) -> None:
-        self.driver.close()
+        if "driver" in self.__dict__:
+            self.driver.close()
 
     def run(self, query: str, parameters: dict | None = None):
         with self.driver.session() as session:
@@ -0,0 +1 @@
+"""Armazenamento local: serialização rápida e payloads brutos em disco."""
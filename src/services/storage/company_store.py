@@ -0,0 +1,19 @@
+"""Leitura/escrita da lista de empresas entre etapas da pipeline (scrape -> enrich -> persist)."""
+
+from pathlib import Path
+
+from models.company import Company
+from services.storage import serialization
+
+
+def save_companies(path: str | Path, companies: list[Company]) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(serialization.dumps([c.to_dict() for c in companies]))
+    tmp.replace(path)
+    return path
+
+
+def load_companies(path: str | Path) -> list[Company]:
+    return [Company.from_dict(d) for d in serialization.loads(Path(path).read_bytes())]
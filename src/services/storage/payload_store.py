@@ -0,0 +1,40 @@
+"""Armazena payloads brutos (saída crua do LLM) em disco.
+
+Em vez de manter `_raw_content` vivo em `Company.meta` durante toda a
+execução, o payload vai para um arquivo endereçado por conteúdo e a
+empresa guarda apenas o ID (`meta["raw_content_ref"]`). O diretório só é
+criado na primeira gravação.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any
+
+from services.storage import serialization
+
+
+class PayloadStore:
+    def __init__(self, base_dir: str | os.PathLike | None = None) -> None:
+        base_dir = base_dir or os.getenv("PAYLOAD_STORE_DIR") or Path("data") / "raw" / "payloads"
+        self.base_dir = Path(base_dir)
+
+    def put(self, kind: str, payload: Any) -> str:
+        """Grava o payload e devolve o ID; conteúdo idêntico reaproveita o arquivo."""
+        data = serialization.dumps(payload)
+        payload_id = f"{kind}-{hashlib.sha1(data).hexdigest()[:20]}"
+        path = self._path(payload_id)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        return payload_id
+
+    def get(self, payload_id: str) -> Any:
+        return serialization.loads(self._path(payload_id).read_bytes())
+
+    def _path(self, payload_id: str) -> Path:
+        # Subdiretório por prefixo do hash evita dezenas de milhares de arquivos numa pasta só
+        digest = payload_id.rsplit("-", 1)[-1]
+        return self.base_dir / digest[:2] / f"{payload_id}.json"
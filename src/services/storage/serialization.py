@@ -0,0 +1,35 @@
+"""Serialização JSON rápida para journal, caches e payloads.
+
+Usa `orjson` quando instalado (bem mais rápido e gera bytes direto);
+caso contrário, cai para o `json` da stdlib com saída compacta.
+"""
+
+from typing import Any
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - tolera ausência de orjson
+    orjson = None
+
+import json
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (set, tuple)):
+        return list(obj)
+    to_dict = getattr(obj, "to_dict", None)
+    if callable(to_dict):
+        return to_dict()
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
@@ -0,0 +1,198 @@
+"""Fila de shards com lease baseada em arquivos, para enriquecimento distribuído.
+
+Layout do diretório da execução (pode estar num volume compartilhado entre hosts):
+
+    manifest.json                    total de shards e tamanho de cada um (gravado por último)
+    pending/shard-00000.json         shards aguardando worker
+    leased/shard-00000.<token>.json  shards em processamento (mtime = último heartbeat)
+    journal/shard-00000.json         resultado enriquecido de cada shard (run journal)
+    attempts/shard-00000.json        tentativas que terminaram em erro e as mensagens
+    failed/shard-00000.json          shards abandonados após `max_attempts` erros
+    payloads/                        PayloadStore compartilhado pelos workers
+
+O claim é um `os.rename` de `pending/` para `leased/` com um token
+aleatório no nome, atômico no mesmo sistema de arquivos: só um worker
+ganha cada shard, e heartbeat/complete só valem enquanto o arquivo com o
+token daquele lease existir. Leases cujo heartbeat passou de
+`lease_seconds` voltam para `pending/` e são reprocessados. Um shard cujo
+processamento levanta erro volta para `pending/` até `max_attempts`
+tentativas; depois disso vai para `failed/` e conta como encerrado.
+"""
+
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from models.company import Company
+from services.storage import serialization
+
+
+@dataclass
+class Lease:
+    shard: str
+    path: Path
+    worker_id: str
+    token: str
+    companies: list[Company]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ShardQueue:
+    def __init__(self, run_dir: str | os.PathLike, lease_seconds: float = 600.0, max_attempts: int = 3) -> None:
+        self.run_dir = Path(run_dir)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.pending_dir = self.run_dir / "pending"
+        self.leased_dir = self.run_dir / "leased"
+        self.journal_dir = self.run_dir / "journal"
+        self.attempts_dir = self.run_dir / "attempts"
+        self.failed_dir = self.run_dir / "failed"
+        self.manifest_path = self.run_dir / "manifest.json"
+        self.payloads_dir = self.run_dir / "payloads"
+
+    def create(self, companies: list[Company], shard_size: int = 50) -> int:
+        """Divide a lista em shards e grava em `pending/`; devolve a quantidade."""
+        if shard_size < 1:
+            raise ValueError(f"shard_size deve ser >= 1 (recebido {shard_size})")
+        if self.manifest_path.exists():
+            raise FileExistsError(f"Fila já existe em {self.run_dir}")
+        for d in (self.pending_dir, self.leased_dir, self.journal_dir, self.attempts_dir, self.failed_dir):
+            d.mkdir(parents=True, exist_ok=True)
+        shards = [companies[i : i + shard_size] for i in range(0, len(companies), shard_size)]
+        for idx, shard in enumerate(shards):
+            self._write_atomic(self.pending_dir / f"shard-{idx:05d}.json", [c.to_dict() for c in shard])
+        self._write_atomic(self.manifest_path, {"total_shards": len(shards), "shard_size": shard_size})
+        return len(shards)
+
+    def ready(self) -> bool:
+        """`True` quando `create` terminou (o manifest é o último arquivo gravado)."""
+        return self.manifest_path.exists()
+
+    @property
+    def total_shards(self) -> int:
+        if not self.ready():
+            return 0
+        return serialization.loads(self.manifest_path.read_bytes())["total_shards"]
+
+    def claim(self, worker_id: str) -> Lease | None:
+        """Pega o próximo shard pendente; `None` se não houver nenhum."""
+        for pending in sorted(self.pending_dir.glob("shard-*.json")):
+            if self._finished(pending.stem):
+                # Já encerrado por um lease anterior que foi reclamado
+                pending.unlink(missing_ok=True)
+                continue
+            token = uuid.uuid4().hex
+            leased = self.leased_dir / f"{pending.stem}.{token}.json"
+            try:
+                # Atualiza o mtime antes do rename para o lease nascer "fresco"
+                os.utime(pending)
+                os.rename(pending, leased)
+            except FileNotFoundError:
+                continue  # outro worker levou
+            companies = [Company.from_dict(d) for d in serialization.loads(leased.read_bytes())]
+            return Lease(shard=pending.stem, path=leased, worker_id=worker_id, token=token, companies=companies)
+        return None
+
+    def owns(self, lease: Lease) -> bool:
+        return lease.path.exists()
+
+    def heartbeat(self, lease: Lease) -> bool:
+        """Renova o lease; `False` se ele já expirou e foi reclamado."""
+        try:
+            os.utime(lease.path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def complete(self, lease: Lease, companies: list[Company]) -> bool:
+        """Grava o resultado no journal; `False` (sem gravar) se o lease não é mais deste worker."""
+        if not self.owns(lease):
+            return False
+        self._write_atomic(
+            self.journal_dir / f"{lease.shard}.json",
+            {"shard": lease.shard, "worker": lease.worker_id, "companies": [c.to_dict() for c in companies]},
+        )
+        lease.path.unlink(missing_ok=True)
+        return True
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        """Registra um erro no shard; `True` se ele esgotou `max_attempts` e foi para `failed/`.
+
+        Abaixo do limite o shard volta para `pending/` e outro worker (ou
+        este mesmo) tenta de novo. Sem o lease, nada é registrado.
+        """
+        if not self.owns(lease):
+            return False
+        attempts_path = self.attempts_dir / f"{lease.shard}.json"
+        record = serialization.loads(attempts_path.read_bytes()) if attempts_path.exists() else {"errors": []}
+        record["errors"].append({"worker": lease.worker_id, "error": error})
+        record.update(shard=lease.shard, attempts=len(record["errors"]))
+        self._write_atomic(attempts_path, record)
+        if record["attempts"] < self.max_attempts:
+            try:
+                os.rename(lease.path, self.pending_dir / f"{lease.shard}.json")
+            except FileNotFoundError:
+                pass  # reclamado entre o `owns` e o rename; já está na fila
+            return False
+        self._write_atomic(self.failed_dir / f"{lease.shard}.json", record)
+        lease.path.unlink(missing_ok=True)
+        return True
+
+    def reclaim_expired(self) -> int:
+        """Devolve para `pending/` os leases sem heartbeat há mais de `lease_seconds`."""
+        reclaimed = 0
+        now = time.time()
+        for leased in self.leased_dir.glob("shard-*.json"):
+            try:
+                if now - leased.stat().st_mtime < self.lease_seconds:
+                    continue
+                shard = leased.name.split(".", 1)[0]
+                if self._finished(shard):
+                    leased.unlink(missing_ok=True)
+                    continue
+                os.rename(leased, self.pending_dir / f"{shard}.json")
+                reclaimed += 1
+            except FileNotFoundError:
+                continue  # concluído ou reclamado por outro processo
+        return reclaimed
+
+    def progress(self) -> dict[str, int]:
+        return {
+            "total": self.total_shards,
+            "pending": sum(1 for _ in self.pending_dir.glob("shard-*.json")),
+            "leased": sum(1 for _ in self.leased_dir.glob("shard-*.json")),
+            "done": sum(1 for _ in self.journal_dir.glob("shard-*.json")),
+            "failed": sum(1 for _ in self.failed_dir.glob("shard-*.json")),
+        }
+
+    def is_done(self) -> bool:
+        """Todos os shards encerrados, com resultado no journal ou abandonados em `failed/`."""
+        if not self.ready():
+            return False
+        progress = self.progress()
+        return progress["done"] + progress["failed"] >= self.total_shards
+
+    def failures(self) -> list[dict]:
+        """Registros dos shards abandonados (shard, tentativas e erros de cada uma)."""
+        return [serialization.loads(path.read_bytes()) for path in sorted(self.failed_dir.glob("shard-*.json"))]
+
+    def results(self) -> Iterator[Company]:
+        """Empresas enriquecidas de todos os shards concluídos, na ordem original (sem os de `failed/`)."""
+        for path in sorted(self.journal_dir.glob("shard-*.json")):
+            for data in serialization.loads(path.read_bytes())["companies"]:
+                yield Company.from_dict(data)
+
+    def _finished(self, shard: str) -> bool:
+        return (self.journal_dir / f"{shard}.json").exists() or (self.failed_dir / f"{shard}.json").exists()
+
+    def _write_atomic(self, path: Path, payload) -> None:
+        tmp = path.with_name(f".{path.name}.{default_worker_id()}.tmp")
+        tmp.write_bytes(serialization.dumps(payload))
+        os.replace(tmp, path)
@@ -0,0 +1,6 @@
+"""Os módulos do projeto importam a partir de `src/` (ex.: `from models.company import Company`)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
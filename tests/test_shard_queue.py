@@ -0,0 +1,136 @@
+import os
+import time
+
+import pytest
+
+from models.company import Company
+from services.storage.shard_queue import ShardQueue
+
+
+def _companies(n):
+    return [Company(name=f"Empresa {i}", sector="Setor") for i in range(n)]
+
+
+def _expire(lease, seconds=3600):
+    old = time.time() - seconds
+    os.utime(lease.path, (old, old))
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = ShardQueue(tmp_path / "run", lease_seconds=60)
+    q.create(_companies(5), shard_size=2)
+    return q
+
+
+def test_create_splits_into_shards(queue):
+    assert queue.total_shards == 3
+    assert queue.progress() == {"total": 3, "pending": 3, "leased": 0, "done": 0, "failed": 0}
+
+
+def test_create_rejects_invalid_shard_size(tmp_path):
+    with pytest.raises(ValueError):
+        ShardQueue(tmp_path / "run").create(_companies(3), shard_size=0)
+
+
+def test_missing_manifest_is_not_ready(tmp_path):
+    q = ShardQueue(tmp_path / "ainda-nao-criada")
+    assert not q.ready()
+    assert q.total_shards == 0
+    assert not q.is_done()
+    assert q.claim("w1") is None
+
+
+def test_claim_gives_each_shard_to_one_worker(queue):
+    l1 = queue.claim("w1")
+    l2 = queue.claim("w2")
+    assert l1.shard != l2.shard
+    assert [c.name for c in l1.companies] == ["Empresa 0", "Empresa 1"]
+    assert l1.token in l1.path.name
+    assert queue.progress()["leased"] == 2
+
+
+def test_complete_writes_journal(queue):
+    while (lease := queue.claim("w1")) is not None:
+        for company in lease.companies:
+            company.website = "https://exemplo.com.br"
+        assert queue.complete(lease, lease.companies)
+    assert queue.is_done()
+    results = list(queue.results())
+    assert [c.name for c in results] == [f"Empresa {i}" for i in range(5)]
+    assert all(c.website == "https://exemplo.com.br" for c in results)
+
+
+def test_fresh_lease_is_not_reclaimed(queue):
+    queue.claim("w1")
+    assert queue.reclaim_expired() == 0
+
+
+def test_expired_lease_is_reclaimed(queue):
+    lease = queue.claim("w1")
+    _expire(lease)
+    assert queue.reclaim_expired() == 1
+    assert not queue.heartbeat(lease)
+    again = queue.claim("w2")
+    assert again.shard == lease.shard
+    assert again.token != lease.token
+
+
+def test_stale_owner_cannot_touch_new_lease(queue):
+    l1 = queue.claim("w1")
+    _expire(l1)
+    queue.reclaim_expired()
+    l2 = queue.claim("w2")
+    assert l2.shard == l1.shard
+
+    assert not queue.heartbeat(l1)
+    assert not queue.complete(l1, l1.companies)
+    assert not (queue.journal_dir / f"{l1.shard}.json").exists()
+    assert queue.heartbeat(l2)
+
+    assert queue.complete(l2, l2.companies)
+    journal = queue.journal_dir / f"{l2.shard}.json"
+    assert journal.exists()
+    assert b'"worker":"w2"' in journal.read_bytes().replace(b" ", b"")
+
+
+def test_failed_shard_returns_to_pending(queue):
+    lease = queue.claim("w1")
+    assert not queue.fail(lease, "RuntimeError: boom")
+    assert not queue.owns(lease)
+    assert queue.progress()["pending"] == 3
+    again = queue.claim("w2")
+    assert again.shard == lease.shard
+    assert queue.complete(again, again.companies)
+    assert (queue.journal_dir / f"{lease.shard}.json").exists()
+
+
+def test_shard_is_abandoned_after_max_attempts(tmp_path):
+    q = ShardQueue(tmp_path / "run", lease_seconds=60, max_attempts=2)
+    q.create(_companies(3), shard_size=2)
+    first = q.claim("w1")
+    assert not q.fail(first, "erro 1")
+    second = q.claim("w2")
+    assert second.shard == first.shard
+    assert q.fail(second, "erro 2")
+
+    assert q.progress()["failed"] == 1
+    [failure] = q.failures()
+    assert failure["shard"] == first.shard
+    assert failure["attempts"] == 2
+    assert [e["worker"] for e in failure["errors"]] == ["w1", "w2"]
+
+    remaining = q.claim("w1")
+    assert remaining.shard != first.shard
+    assert q.claim("w1") is None
+    assert q.complete(remaining, remaining.companies)
+    assert q.is_done()
+    assert [c.name for c in q.results()] == ["Empresa 2"]
+
+
+def test_stale_owner_cannot_fail_shard(queue):
+    l1 = queue.claim("w1")
+    _expire(l1)
+    queue.reclaim_expired()
+    assert not queue.fail(l1, "erro tardio")
+    assert not (queue.attempts_dir / f"{l1.shard}.json").exists()